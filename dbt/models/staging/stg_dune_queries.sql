@@ -7,6 +7,8 @@
 
 -- Staging model for raw Dune query results
 -- This model reads from the SQLite database and prepares data for transformation
+-- Only JSON-encoded results can be parsed here; other encodings and
+-- count-only results (NULL data) are skipped
 
 select
     id,
@@ -17,4 +19,6 @@ select
     row_count,
     created_at
 from {{ source('raw', 'query_results') }}
+where encoding = 'json'
+  and data is not null
 
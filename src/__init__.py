@@ -0,0 +1 @@
+"""X402 Pipeline - Dune Analytics data pipeline for Artemis"""
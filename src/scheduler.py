@@ -8,38 +8,237 @@ Can be run as a cron job, systemd service, or standalone daemon.
 import os
 import sys
 import time
+import queue
+import random
+import atexit
+import select
+import signal
+import socket
+import asyncio
+import contextlib
 import logging
-from datetime import datetime, timedelta
+import logging.handlers
+import threading
+import functools
+from datetime import date, datetime, timedelta
 from pathlib import Path
 import argparse
 
-# Add parent directory to path to import x402_pipeline
-sys.path.insert(0, str(Path(__file__).parent))
-
 try:
-    from x402_pipeline import DuneDataPipeline, QUERY_IDS
+    from .x402_pipeline import DuneDataPipeline, DEFAULT_FETCH_TTL_SECONDS, QUERY_IDS, create_dbt_runner
 except ImportError:
-    print("Error: Could not import x402_pipeline. Make sure it's in the same directory.")
-    sys.exit(1)
+    # Run as a script (python src/scheduler.py), src/ is already on sys.path
+    try:
+        from x402_pipeline import DuneDataPipeline, DEFAULT_FETCH_TTL_SECONDS, QUERY_IDS, create_dbt_runner
+    except ImportError:
+        print("Error: Could not import x402_pipeline. Make sure it's in the same directory.")
+        sys.exit(1)
+
+
+# Background thread that writes queued log records to the file and console
+_log_listener = None
+
+# Log file writes are batched; ERROR records and a full buffer flush early
+LOG_BUFFER_CAPACITY = 1024
+
+# Today's log file per log directory; emptied when the date changes
+_logfile_cache = {}
+
+# Failed daemon updates are retried after 2, 4, 8, ... seconds (plus jitter),
+# capped at this delay
+RETRY_MAX_DELAY_SECONDS = 3600
+RETRY_JITTER_SECONDS = 30
+
+
+def _daily_log(log_dir: str) -> Path:
+    """Return today's log file path for a log directory"""
+    key = (date.today(), log_dir)
+    if key not in _logfile_cache:
+        _logfile_cache.clear()
+        _logfile_cache[key] = Path(log_dir) / f"scheduler_{key[0]:%Y%m%d}.log"
+    return _logfile_cache[key]
+
+
+def _stop_log_listener():
+    """Drain the log queue and close the listener's handlers"""
+    global _log_listener
+    if _log_listener is None:
+        return
+    
+    _log_listener.stop()
+    for handler in _log_listener.handlers:
+        target = getattr(handler, "target", None)
+        handler.close()
+        if target is not None:
+            target.close()
+    _log_listener = None
+
+
+def flush_logging():
+    """Write out all queued and buffered log records"""
+    if _log_listener is None:
+        return
+    
+    _log_listener.queue.join()
+    for handler in _log_listener.handlers:
+        handler.flush()
+
+
+def shutdown_logging():
+    """Flush queued log records and close the log handlers"""
+    _stop_log_listener()
+    _configure_logging.cache_clear()
+
+
+atexit.register(shutdown_logging)
+
+
+@functools.lru_cache(maxsize=4)
+def _configure_logging(log_file: Path):
+    """Install the handlers writing to one day's log file"""
+    # Only create the directory when it is actually missing
+    try:
+        os.stat(log_file.parent)
+    except FileNotFoundError:
+        os.makedirs(log_file.parent, exist_ok=True)
+    
+    # Loggers only enqueue records; the listener thread does the file and
+    # console writes so the pipeline never blocks on log I/O
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    file_handler = logging.FileHandler(log_file)
+    console_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+    
+    # Scheduler logs are best effort, so write the file in batches rather
+    # than flushing after every record
+    handlers = [
+        logging.handlers.MemoryHandler(
+            LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=file_handler
+        ),
+        console_handler
+    ]
+    
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    # Replacing the previous day's listener and force=True on basicConfig
+    # make a long-running daemon move to a new log file on its first
+    # update after midnight
+    global _log_listener
+    _stop_log_listener()
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler], force=True)
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    
+    return logging.getLogger(__name__)
 
 
 def setup_logging(log_dir: str = "logs"):
-    """Set up logging for scheduled runs"""
-    log_path = Path(log_dir)
-    log_path.mkdir(parents=True, exist_ok=True)
-    
-    log_file = log_path / f"scheduler_{datetime.now().strftime('%Y%m%d')}.log"
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
+    """Set up logging for scheduled runs (cached per directory and day)"""
+    return _configure_logging(_daily_log(log_dir))
+
+
+async def _fetch_all_async(pipeline, force: bool = False):
+    """
+    Fetch all queries concurrently with the pipeline's async Dune client.
+    
+    Only the outcome of each query is kept; the stored data is read back from
+    SQLite by the export, so it is not held in memory for the rest of the run.
+    
+    Args:
+        pipeline: Initialized DuneDataPipeline
+        force: Fetch every query even if its stored result is still fresh
+        
+    Returns:
+        Dictionary mapping logical names to whether their fetch succeeded
+    """
+    results = await pipeline.afetch_all(force=force)
+    return {name: result is not None for name, result in results.items()}
+
+
+class Span:
+    """
+    Time a block of work with the monotonic perf_counter clock.
+    
+    Durations are recorded under the span's name in the optional spans dict,
+    so a run collects all of its stage timings in one place.
+    """
+    
+    def __init__(self, name: str, spans: dict = None):
+        self.name = name
+        self.spans = spans
+        self.duration = 0.0
+    
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.duration = time.perf_counter() - self._start
+        if self.spans is not None:
+            self.spans[self.name] = self.duration
+        return False
+
+
+async def _run_stage(name: str, spans: dict, func, *args, **kwargs):
+    """Run a blocking pipeline stage in the executor under a Span"""
+    loop = asyncio.get_running_loop()
+    with Span(name, spans):
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+
+async def _run_update_stages(
+    pipeline,
+    output_dir: str,
+    export_format: str,
+    logger,
+    spans: dict,
+    force: bool = False,
+    dbt_runner=None
+):
+    """
+    Run the fetch, export and dbt stages of an update.
+    
+    Export and dbt only read the freshly fetched results back from SQLite
+    and are independent of each other, so once fetching finishes they run
+    concurrently instead of back to back. Stage durations are recorded
+    in spans.
+    
+    Returns:
+        Tuple of (per-query fetch success flags, export summary, dbt success flag)
+    """
+    # Fetch all queries
+    logger.info("\nFetching all queries from Dune...")
+    with Span("fetch", spans):
+        results = await _fetch_all_async(pipeline, force=force)
+    
+    successful = sum(results.values())
+    logger.info(f"\n[OK] Fetch complete: {successful}/{len(QUERY_IDS)} queries fetched successfully")
+    logger.info(f"  Duration: {spans['fetch']:.2f} seconds")
+    
+    # Export for Artemis and run dbt transformations side by side
+    logger.info("\nExporting data for Artemis Analytics and running dbt transformations...")
+    summary, dbt_success = await asyncio.gather(
+        _run_stage("export", spans, pipeline.export_for_artemis, output_dir=output_dir, format=export_format),
+        _run_stage("dbt", spans, pipeline.run_dbt_transforms, runner=dbt_runner),
     )
     
-    return logging.getLogger(__name__)
+    logger.info(f"[OK] Export complete: {summary['total_rows']} rows exported")
+    logger.info(f"  Duration: {spans['export']:.2f} seconds")
+    logger.info(f"  Files created: {len(summary['files_created'])}")
+    
+    if dbt_success:
+        logger.info(f"[OK] dbt transformations completed")
+        logger.info(f"  Duration: {spans['dbt']:.2f} seconds")
+    else:
+        logger.warning(f"[WARN] dbt transformations failed or skipped")
+        logger.warning(f"  Duration: {spans['dbt']:.2f} seconds")
+    
+    return results, summary, dbt_success
 
 
 def run_daily_update(
@@ -47,7 +246,10 @@ def run_daily_update(
     db_path: str = "data/databases/x402_data.db",
     output_dir: str = "data/exports",
     export_format: str = "both",
-    log_dir: str = "data/logs"
+    log_dir: str = "data/logs",
+    force: bool = False,
+    dbt_runner=None,
+    fetch_ttl_seconds: int = DEFAULT_FETCH_TTL_SECONDS
 ):
     """
     Run a complete daily update: fetch all queries and export for Artemis.
@@ -58,70 +260,51 @@ def run_daily_update(
         output_dir: Directory for exports
         export_format: Export format ("parquet", "csv", or "both")
         log_dir: Directory for log files
+        force: Refetch queries even if their stored results are still fresh
+        dbt_runner: dbtRunner to reuse for the dbt stage (see create_dbt_runner)
+        fetch_ttl_seconds: How old a stored result may be and still be
+            reused instead of fetching the query again
     """
     logger = setup_logging(log_dir)
     
-    logger.info("="*60)
-    logger.info("Starting daily X402 Pipeline update")
-    logger.info("="*60)
+    logger.info("\n".join([
+        "="*60,
+        "Starting daily X402 Pipeline update",
+        "="*60
+    ]))
     
-    start_time = time.time()
+    spans = {}
     
     try:
-        # Initialize pipeline
-        logger.info("Initializing pipeline...")
-        pipeline = DuneDataPipeline(db_path=db_path, api_key=api_key)
-        logger.info("[OK] Pipeline initialized")
-        
-        # Fetch all queries
-        logger.info("\nFetching all queries from Dune...")
-        fetch_start = time.time()
-        results = pipeline.fetch_all()
-        fetch_duration = time.time() - fetch_start
+        with Span("total", spans):
+            # Initialize pipeline
+            logger.info("Initializing pipeline...")
+            # Closed even if a stage fails, so a daemon that keeps retrying
+            # doesn't pile up open connections
+            with contextlib.closing(DuneDataPipeline(db_path=db_path, api_key=api_key, fetch_ttl_seconds=fetch_ttl_seconds)) as pipeline:
+                logger.info("[OK] Pipeline initialized")
+                
+                results, summary, dbt_success = asyncio.run(
+                    _run_update_stages(
+                        pipeline, output_dir, export_format, logger, spans,
+                        force=force, dbt_runner=dbt_runner
+                    )
+                )
         
-        successful = sum(1 for r in results.values() if r is not None)
+        successful = sum(results.values())
         total = len(QUERY_IDS)
         
-        logger.info(f"\n[OK] Fetch complete: {successful}/{total} queries fetched successfully")
-        logger.info(f"  Duration: {fetch_duration:.2f} seconds")
-        
-        # Export for Artemis
-        logger.info("\nExporting data for Artemis Analytics...")
-        export_start = time.time()
-        summary = pipeline.export_for_artemis(
-            output_dir=output_dir,
-            format=export_format
-        )
-        export_duration = time.time() - export_start
-        
-        logger.info(f"[OK] Export complete: {summary['total_rows']} rows exported")
-        logger.info(f"  Duration: {export_duration:.2f} seconds")
-        logger.info(f"  Files created: {len(summary['files_created'])}")
-        
-        # Run dbt transformations
-        logger.info("\nRunning dbt transformations...")
-        dbt_start = time.time()
-        dbt_success = pipeline.run_dbt_transforms()
-        dbt_duration = time.time() - dbt_start
-        
-        if dbt_success:
-            logger.info(f"[OK] dbt transformations completed")
-            logger.info(f"  Duration: {dbt_duration:.2f} seconds")
-        else:
-            logger.warning(f"[WARN] dbt transformations failed or skipped")
-            logger.warning(f"  Duration: {dbt_duration:.2f} seconds")
-        
-        total_duration = time.time() - start_time
-        
-        logger.info("\n" + "="*60)
-        logger.info("DAILY UPDATE SUMMARY")
-        logger.info("="*60)
-        logger.info(f"Queries fetched: {successful}/{total}")
-        logger.info(f"Rows exported: {summary['total_rows']}")
-        logger.info(f"Files created: {len(summary['files_created'])}")
-        logger.info(f"Total duration: {total_duration:.2f} seconds")
-        logger.info(f"Status: [OK] SUCCESS")
-        logger.info("="*60)
+        logger.info("\n".join([
+            "\n" + "="*60,
+            "DAILY UPDATE SUMMARY",
+            "="*60,
+            f"Queries fetched: {successful}/{total}",
+            f"Rows exported: {summary['total_rows']}",
+            f"Files created: {len(summary['files_created'])}",
+            f"Total duration: {spans['total']:.2f} seconds",
+            f"Status: [OK] SUCCESS",
+            "="*60
+        ]))
         
         return True
         
@@ -131,17 +314,105 @@ def run_daily_update(
         return False
 
 
+def _sleep_until(deadline: datetime, stop_event: threading.Event) -> bool:
+    """
+    Sleep until a deadline, or until SIGINT/SIGTERM requests a stop.
+    
+    The sleep is one select() on a socket that Python writes to whenever a
+    signal arrives (signal.set_wakeup_fd). A stop signal therefore wakes it
+    even if it lands just before select() is entered, and no signal handler
+    has to raise out of the sleep. Where the wakeup fd can't be set (outside
+    the main thread), it waits on stop_event instead.
+    
+    Args:
+        deadline: When to wake up
+        stop_event: Set by the stop signal handlers
+        
+    Returns:
+        True if a stop was requested
+    """
+    reader, writer = socket.socketpair()
+    try:
+        reader.setblocking(False)
+        writer.setblocking(False)
+        try:
+            previous_fd = signal.set_wakeup_fd(writer.fileno())
+        except ValueError:
+            return stop_event.wait(max(0.0, (deadline - datetime.now()).total_seconds()))
+        
+        try:
+            while not stop_event.is_set():
+                remaining = (deadline - datetime.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                if select.select([reader], [], [], remaining)[0]:
+                    # The handlers have run by now; any other signal just
+                    # goes back to sleep
+                    reader.recv(4096)
+        finally:
+            signal.set_wakeup_fd(previous_fd)
+    finally:
+        reader.close()
+        writer.close()
+    
+    return stop_event.is_set()
+
+
+def _retry_delay(consecutive_failures: int) -> float:
+    """Seconds to wait before retrying after this many failed updates in a row"""
+    return min(
+        RETRY_MAX_DELAY_SECONDS,
+        2 ** consecutive_failures + random.uniform(0, RETRY_JITTER_SECONDS)
+    )
+
+
+def _tune_process(logger, pin_cpu: int = None, niceness: int = None):
+    """
+    Pin the scheduler process to one CPU and/or set its nice value.
+    
+    Both are best effort: unsupported platforms and missing privileges
+    (a negative nice value usually needs root) only log a warning.
+    """
+    if pin_cpu is not None:
+        if hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, {pin_cpu})
+                logger.info(f"Pinned scheduler to CPU {pin_cpu}")
+            except OSError as e:
+                logger.warning(f"[WARN] Could not pin scheduler to CPU {pin_cpu}: {e}")
+        else:
+            logger.warning("[WARN] CPU pinning is not supported on this platform")
+    
+    if niceness is not None:
+        if hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, 0, niceness)
+                logger.info(f"Set scheduler nice value to {niceness}")
+            except OSError as e:
+                logger.warning(f"[WARN] Could not set nice value to {niceness}: {e}")
+        else:
+            logger.warning("[WARN] Setting the nice value is not supported on this platform")
+
+
 def run_continuous_scheduler(
     api_key: str = None,
     db_path: str = "data/databases/x402_data.db",
     output_dir: str = "data/exports",
     export_format: str = "both",
     interval_hours: int = 24,
-    log_dir: str = "data/logs"
+    log_dir: str = "data/logs",
+    force: bool = False,
+    pin_cpu: int = None,
+    niceness: int = None,
+    max_consecutive_failures: int = None,
+    fetch_ttl_seconds: int = None
 ):
     """
     Run as a continuous daemon, updating every N hours.
     
+    Failed updates are retried with exponential backoff and jitter instead
+    of waiting for the next interval.
+    
     Args:
         api_key: Dune API key
         db_path: Path to SQLite database
@@ -149,47 +420,86 @@ def run_continuous_scheduler(
         export_format: Export format
         interval_hours: Hours between updates (default: 24)
         log_dir: Directory for log files
+        force: Refetch queries even if their stored results are still fresh
+        pin_cpu: CPU to pin the scheduler process to (Linux only)
+        niceness: Nice value to run the scheduler process at
+        max_consecutive_failures: Exit with a nonzero status after this many
+            failed updates in a row, so a service manager can restart or
+            alert (None retries forever)
+        fetch_ttl_seconds: How old a stored result may be and still be
+            reused. Defaults to half the interval, capped at
+            DEFAULT_FETCH_TTL_SECONDS, so results from the previous update
+            are never reused but retries after a partial failure are.
     """
     logger = setup_logging(log_dir)
     
-    logger.info("="*60)
-    logger.info("Starting X402 Pipeline Scheduler (Continuous Mode)")
-    logger.info(f"Update interval: {interval_hours} hours")
-    logger.info("Press Ctrl+C to stop")
-    logger.info("="*60)
+    if fetch_ttl_seconds is None:
+        fetch_ttl_seconds = int(min(DEFAULT_FETCH_TTL_SECONDS, interval_hours * 3600 / 2))
+    
+    _tune_process(logger, pin_cpu=pin_cpu, niceness=niceness)
+    
+    logger.info("\n".join([
+        "="*60,
+        "Starting X402 Pipeline Scheduler (Continuous Mode)",
+        f"Update interval: {interval_hours} hours",
+        "Press Ctrl+C to stop",
+        "="*60
+    ]))
+    
+    # Ctrl+C (or a service stop) during an update lets it finish and then
+    # stops the scheduler instead of sleeping until the next update
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+    
+    # Parse the dbt project once and reuse it for every update
+    dbt_runner = create_dbt_runner()
     
     next_update = datetime.now()
+    consecutive_failures = 0
     
     try:
         while True:
+            if _sleep_until(next_update, stop_event):
+                break
+            
             now = datetime.now()
+            logger.info(f"\nScheduled update triggered at {now.strftime('%Y-%m-%d %H:%M:%S')}")
             
-            if now >= next_update:
-                logger.info(f"\nScheduled update triggered at {now.strftime('%Y-%m-%d %H:%M:%S')}")
+            success = run_daily_update(
+                api_key=api_key,
+                db_path=db_path,
+                output_dir=output_dir,
+                export_format=export_format,
+                log_dir=log_dir,
+                force=force,
+                dbt_runner=dbt_runner,
+                fetch_ttl_seconds=fetch_ttl_seconds
+            )
+            
+            if success:
+                consecutive_failures = 0
+                next_update = now + timedelta(hours=interval_hours)
+                logger.info(f"\nNext update scheduled for: {next_update.strftime('%Y-%m-%d %H:%M:%S')}")
+            else:
+                consecutive_failures += 1
+                if max_consecutive_failures and consecutive_failures >= max_consecutive_failures:
+                    logger.error(f"\n[ERROR] {consecutive_failures} consecutive updates failed, stopping scheduler")
+                    shutdown_logging()
+                    sys.exit(1)
                 
-                success = run_daily_update(
-                    api_key=api_key,
-                    db_path=db_path,
-                    output_dir=output_dir,
-                    export_format=export_format,
-                    log_dir=log_dir
+                delay = _retry_delay(consecutive_failures)
+                next_update = datetime.now() + timedelta(seconds=delay)
+                logger.warning(
+                    f"\nUpdate failed ({consecutive_failures} in a row). "
+                    f"Retrying in {delay:.0f} seconds at: {next_update.strftime('%Y-%m-%d %H:%M:%S')}"
                 )
-                
-                if success:
-                    next_update = now + timedelta(hours=interval_hours)
-                    logger.info(f"\nNext update scheduled for: {next_update.strftime('%Y-%m-%d %H:%M:%S')}")
-                else:
-                    # Retry in 1 hour if update failed
-                    next_update = now + timedelta(hours=1)
-                    logger.warning(f"\nUpdate failed. Retrying in 1 hour at: {next_update.strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                logger.info(f"\nSleeping until next update...")
-            
-            # Sleep for 1 minute, then check again
-            time.sleep(60)
             
-    except KeyboardInterrupt:
+            logger.info(f"\nSleeping until next update...")
+            flush_logging()
+        
         logger.info("\n\nScheduler stopped by user")
+        shutdown_logging()
         sys.exit(0)
     except Exception as e:
         logger.error(f"\n[ERROR] Fatal error in scheduler: {e}", exc_info=True)
@@ -204,16 +514,16 @@ def main():
         epilog="""
 Examples:
   # Run once (for cron jobs)
-  python scheduler.py run-once
+  python -m src.scheduler run-once
   
   # Run as continuous daemon (updates every 24 hours)
-  python scheduler.py daemon
+  python -m src.scheduler daemon
   
   # Run as daemon with custom interval (updates every 12 hours)
-  python scheduler.py daemon --interval 12
+  python -m src.scheduler daemon --interval 12
   
   # Run once with custom settings
-  python scheduler.py run-once --output-dir ./custom_output --format parquet
+  python -m src.scheduler run-once --output-dir ./custom_output --format parquet
         """
     )
     
@@ -260,6 +570,38 @@ Examples:
         help="Directory for log files (default: data/logs)"
     )
     
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Refetch queries even if their stored results are still fresh"
+    )
+    
+    parser.add_argument(
+        "--fetch-ttl",
+        type=int,
+        help="Reuse stored results younger than this many seconds instead of "
+             "refetching (default: 3600 for run-once, half the interval up to "
+             "3600 for daemon)"
+    )
+    
+    parser.add_argument(
+        "--pin-cpu",
+        type=int,
+        help="Pin the daemon to this CPU (Linux only)"
+    )
+    
+    parser.add_argument(
+        "--nice",
+        type=int,
+        help="Nice value for the daemon process (negative values usually need root)"
+    )
+    
+    parser.add_argument(
+        "--max-consecutive-failures",
+        type=int,
+        help="Exit with an error after this many failed daemon updates in a row (default: retry forever)"
+    )
+    
     args = parser.parse_args()
     
     # Get API key from args or environment
@@ -275,7 +617,11 @@ Examples:
             db_path=args.db,
             output_dir=args.output_dir,
             export_format=args.format,
-            log_dir=args.log_dir
+            log_dir=args.log_dir,
+            force=args.force,
+            fetch_ttl_seconds=(
+                DEFAULT_FETCH_TTL_SECONDS if args.fetch_ttl is None else args.fetch_ttl
+            )
         )
         sys.exit(0 if success else 1)
     
@@ -286,7 +632,12 @@ Examples:
             output_dir=args.output_dir,
             export_format=args.format,
             interval_hours=args.interval,
-            log_dir=args.log_dir
+            log_dir=args.log_dir,
+            force=args.force,
+            pin_cpu=args.pin_cpu,
+            niceness=args.nice,
+            max_consecutive_failures=args.max_consecutive_failures,
+            fetch_ttl_seconds=args.fetch_ttl
         )
 
 
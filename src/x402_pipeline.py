@@ -5,20 +5,30 @@ Fetches query results from Dune Analytics, stores them locally in SQLite,
 and provides simple access functions with CLI interface.
 """
 
+import io
 import os
 import sys
 import sqlite3
+import re
 import json
 import time
+import asyncio
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import threading
+import functools
+import contextlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import argparse
 
 try:
     from dune_client.client import DuneClient
+    from dune_client.client_async import AsyncDuneClient
+    from dune_client.models import ExecutionState
     from dune_client.query import QueryBase
 except ImportError:
     print("Error: dune-client library not installed.")
@@ -26,12 +36,31 @@ except ImportError:
     sys.exit(1)
 
 try:
-    import pandas as pd
     import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.json as pajson
     import pyarrow.parquet as pq
-    HAS_PANDAS = True
+    HAS_PYARROW = True
 except ImportError:
-    HAS_PANDAS = False
+    HAS_PYARROW = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
 
 
 # Query ID mappings
@@ -47,6 +76,209 @@ QUERY_IDS = {
     "volume by token solana": 6094785,
 }
 
+# Precomputed for the name checks and error messages of every lookup
+_QUERY_NAMES = frozenset(QUERY_IDS)
+_QUERY_NAMES_STR = ", ".join(QUERY_IDS)
+
+# Results fetched more recently than this are reused instead of refetched
+DEFAULT_FETCH_TTL_SECONDS = 3600
+
+# Queries fetched at once by fetch_all, kept within Dune's parallel request limit
+MAX_CONCURRENT_FETCHES = 3
+
+# Number of queries whose latest decoded rows are kept in memory for get/tail
+RESULT_CACHE_SIZE = 4
+
+# How fetched rows can be stored in query_results.data. dbt reads the data
+# column with SQLite's JSON functions, so only "json" rows reach the models.
+STORAGE_ENCODINGS = ("json", "msgpack", "zstd+json")
+
+# "zstd+json" results are newline-delimited JSON rows compressed with a
+# dictionary trained on the first result stored for each query, since every
+# row of a query repeats the same keys. Until there are enough rows to train
+# one, results are compressed without a dictionary.
+ZSTD_DICT_SIZE = 32768
+ZSTD_LEVEL = 3
+
+# Applied to the pipeline's database connection. WAL lets the export and dbt
+# read while a fetch is writing, and with WAL synchronous=NORMAL only syncs at
+# checkpoints instead of on every commit.
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA cache_size=-65536;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+"""
+
+# Seconds between execution status checks when fetching only a row count,
+# the same as dune-client's own run_query
+STATUS_POLL_SECONDS = 5
+
+# Columns of query_results. data is NULL for results fetched with
+# store_rows=False, which only record the row count.
+QUERY_RESULTS_COLUMNS = """
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    logical_name TEXT NOT NULL,
+    query_id INTEGER NOT NULL,
+    data TEXT,
+    timestamp TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    encoding TEXT NOT NULL DEFAULT 'json'
+"""
+
+# Latest stored result with data for every logical name in one statement.
+# Rows are ranked by id and timestamp only, then joined back, so the
+# payloads of older results are never read.
+LATEST_RESULTS_SQL = """
+    SELECT r.logical_name, {columns}
+    FROM query_results r
+    JOIN (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY logical_name
+            ORDER BY timestamp DESC, id DESC
+        ) AS rn
+        FROM query_results
+        WHERE data IS NOT NULL
+    ) latest ON latest.id = r.id
+    WHERE latest.rn = 1
+"""
+
+
+# orjson turns integers outside the 64-bit range (e.g. uint256 token amounts,
+# or negatives below -2**63, which can be just 19 digits) into floats when
+# decoding, so JSON with a run of 19+ digits takes the stdlib path
+_WIDE_NUMBER = re.compile(r"\d{19}")
+_WIDE_NUMBER_BYTES = re.compile(rb"\d{19}")
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to a JSON string, with orjson when available"""
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # Integers wider than 64 bits and types orjson doesn't know
+            pass
+    return json.dumps(obj)
+
+
+def _json_loads(data: str) -> Any:
+    """Parse a JSON string, with orjson when available"""
+    if HAS_ORJSON and not _WIDE_NUMBER.search(data):
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _without_timestamps(type_: "pa.DataType") -> "pa.DataType":
+    """Replace timestamp types, including nested ones, with strings"""
+    if pa.types.is_timestamp(type_):
+        return pa.string()
+    if pa.types.is_struct(type_):
+        return pa.struct([field.with_type(_without_timestamps(field.type)) for field in type_])
+    if pa.types.is_list(type_):
+        return pa.list_(type_.value_field.with_type(_without_timestamps(type_.value_type)))
+    return type_
+
+
+def _read_ndjson(ndjson: bytes) -> "pa.Table":
+    """
+    Read newline-delimited JSON rows into an Arrow table.
+    
+    pyarrow's JSON reader turns ISO date strings into timestamps, while rows
+    decoded in Python keep them as strings. Fields inferred as timestamps
+    are read again as strings, so every encoding exports the same values.
+    """
+    if not ndjson:
+        return pa.table({})
+    
+    table = pajson.read_json(io.BytesIO(ndjson))
+    schema = pa.schema([field.with_type(_without_timestamps(field.type)) for field in table.schema])
+    if schema.equals(table.schema):
+        return table
+    
+    return pajson.read_json(
+        io.BytesIO(ndjson),
+        parse_options=pajson.ParseOptions(explicit_schema=schema)
+    )
+
+
+def _unify_schemas(schemas: List["pa.Schema"]) -> "pa.Schema":
+    """
+    Merge the schemas of several queries into one.
+    
+    Columns keep their order of first appearance, with e.g. int64 widened
+    to double where queries disagree. Columns whose types can't be merged
+    at all become strings.
+    """
+    try:
+        return pa.unify_schemas(schemas, promote_options="permissive")
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        pass
+    
+    fields_by_name = {}
+    for schema in schemas:
+        for field in schema:
+            fields_by_name.setdefault(field.name, []).append(field)
+    
+    conflicting = set()
+    for name, fields in fields_by_name.items():
+        try:
+            pa.unify_schemas([pa.schema([field]) for field in fields], promote_options="permissive")
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            conflicting.add(name)
+    
+    return pa.unify_schemas(
+        [
+            pa.schema([
+                field.with_type(pa.string()) if field.name in conflicting else field
+                for field in schema
+            ])
+            for schema in schemas
+        ],
+        promote_options="permissive"
+    )
+
+
+def _cast_column(column: "pa.ChunkedArray", type_: "pa.DataType") -> "pa.ChunkedArray":
+    """Cast a column, writing nested values as JSON text when cast to string"""
+    try:
+        return column.cast(type_)
+    except pa.ArrowNotImplementedError:
+        if not pa.types.is_string(type_):
+            raise
+        return pa.chunked_array(
+            [[None if value is None else _json_dumps(value) for value in column.to_pylist()]],
+            type_
+        )
+
+
+def _conform_table(table: "pa.Table", schema: "pa.Schema") -> "pa.Table":
+    """Cast and reorder a table's columns to schema, filling missing columns with nulls"""
+    columns = [
+        _cast_column(table.column(field.name), field.type)
+        if field.name in table.column_names
+        else pa.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _constant_column(value: Any, length: int) -> "pa.Array":
+    """
+    Build a column repeating one value.
+    
+    Strings are dictionary-encoded, so each row costs a one-byte index
+    instead of its own copy of the string.
+    """
+    if isinstance(value, str):
+        return pa.DictionaryArray.from_arrays(
+            pa.repeat(pa.scalar(0, pa.int8()), length),
+            pa.array([value])
+        )
+    return pa.repeat(value, length)
+
 
 @dataclass
 class QueryResult:
@@ -54,9 +286,48 @@ class QueryResult:
     id: int
     logical_name: str
     query_id: int
-    data: str  # JSON string
+    data: Optional[Union[str, bytes]]  # Rows encoded as given by encoding, None if not stored or not loaded
     timestamp: str
     row_count: int
+    encoding: str = "json"
+
+
+class _OrjsonDuneClient(DuneClient):
+    """
+    DuneClient that decodes API responses with orjson.
+    
+    Result pages are the largest payloads the pipeline handles, and the stock
+    handler decodes them with the stdlib json module and formats the whole
+    response into a debug message even when debug logging is off.
+    """
+    
+    def _handle_response(self, response):
+        body = response.content
+        if _WIDE_NUMBER_BYTES.search(body):
+            return super()._handle_response(response)
+        try:
+            response_json = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Error responses aren't always JSON
+            return super()._handle_response(response)
+        response.raise_for_status()
+        return response_json
+
+
+class _OrjsonAsyncDuneClient(AsyncDuneClient):
+    """AsyncDuneClient that decodes API responses with orjson (see _OrjsonDuneClient)"""
+    
+    async def _handle_response(self, response):
+        # aiohttp keeps the body once read, so the stock handler can reuse it
+        body = await response.read()
+        if _WIDE_NUMBER_BYTES.search(body):
+            return await super()._handle_response(response)
+        try:
+            response_json = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return await super()._handle_response(response)
+        response.raise_for_status()
+        return response_json
 
 
 class DuneDataPipeline:
@@ -64,15 +335,63 @@ class DuneDataPipeline:
     X402 Pipeline - Main pipeline class for fetching and storing Dune Analytics query results.
     """
     
-    def __init__(self, db_path: str = "data/databases/x402_data.db", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        db_path: str = "data/databases/x402_data.db",
+        api_key: Optional[str] = None,
+        fetch_ttl_seconds: int = DEFAULT_FETCH_TTL_SECONDS,
+        storage_encoding: str = "json",
+        row_table: bool = False
+    ):
         """
         Initialize the pipeline.
         
         Args:
             db_path: Path to SQLite database file
             api_key: Dune API key (if None, reads from DUNE_API_KEY env var)
+            fetch_ttl_seconds: How long a stored result stays fresh enough to
+                be reused instead of fetching the query again
+            storage_encoding: How to store fetched rows, "json" (default),
+                "msgpack" or "zstd+json". MessagePack rows are smaller and
+                faster to decode, zstd-compressed JSON is smaller still. Both
+                are skipped by the dbt models.
+            row_table: Also store every fetched row as its own JSON row in
+                the query_rows table, so rows can be queried with SQL
         """
+        if storage_encoding not in STORAGE_ENCODINGS:
+            raise ValueError(
+                f"Unknown storage encoding '{storage_encoding}'. "
+                f"Choose from: {', '.join(STORAGE_ENCODINGS)}"
+            )
+        if storage_encoding == "msgpack" and not HAS_MSGPACK:
+            raise ImportError(
+                "msgpack is required for msgpack storage. "
+                "Install with: pip install msgpack"
+            )
+        if storage_encoding == "zstd+json" and not HAS_ZSTD:
+            raise ImportError(
+                "zstandard is required for zstd+json storage. "
+                "Install with: pip install zstandard"
+            )
+        
         self.db_path = db_path
+        self.fetch_ttl_seconds = fetch_ttl_seconds
+        self.storage_encoding = storage_encoding
+        self.row_table = row_table
+        
+        # logical_name -> (result id, decoded rows) of recently used results,
+        # least recently used first
+        self._result_cache = OrderedDict()
+        
+        # dict id -> zstd dictionary, loaded from zstd_dicts on first use
+        self._zstd_dicts = {}
+        
+        # The Dune query of every logical name, built once and reused by
+        # every fetch
+        self._queries = {
+            logical_name: QueryBase(query_id=query_id, name=logical_name)
+            for logical_name, query_id in QUERY_IDS.items()
+        }
         self.api_key = api_key or os.getenv("DUNE_API_KEY")
         
         if not self.api_key:
@@ -82,47 +401,223 @@ class DuneDataPipeline:
             )
         
         # Initialize Dune client
-        self.client = DuneClient(self.api_key)
+        self.client = (_OrjsonDuneClient if HAS_ORJSON else DuneClient)(self.api_key)
+        
+        # One connection for the pipeline's lifetime, so its page cache stays
+        # warm between calls. Fetch workers and the scheduler's stages use it
+        # from several threads, so access is serialized with a lock.
+        self._conn = self._connect()
+        self._db_lock = threading.RLock()
         
         # Initialize database
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the SQLite database with SQLITE_PRAGMAS applied"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.executescript(SQLITE_PRAGMAS)
+        return conn
+    
+    @contextlib.contextmanager
+    def _db(self) -> Iterator[sqlite3.Connection]:
+        """Hold the pipeline's database connection for a block of statements"""
+        with self._db_lock:
+            if self._conn is None:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed pipeline")
+            yield self._conn
+    
+    def close(self):
+        """Close the pipeline's database connection"""
+        conn = getattr(self, "_conn", None)
+        if conn is not None:
+            conn.close()
+            self._conn = None
+    
+    def __del__(self):
+        self.close()
+    
     def _init_database(self):
         """Initialize SQLite database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create table for query results
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS query_results (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                logical_name TEXT NOT NULL,
-                query_id INTEGER NOT NULL,
-                data TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                row_count INTEGER NOT NULL,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        with self._db() as conn:
+            cursor = conn.cursor()
+            
+            # Bring databases created by older versions up to date first; the
+            # schema script below only creates what is missing
+            columns = {
+                column[1]: column[3]
+                for column in cursor.execute("PRAGMA table_info(query_results)")
+            }
+            
+            # Databases created before rows could be stored as MessagePack hold
+            # JSON only
+            if columns and "encoding" not in columns:
+                cursor.execute("""
+                    ALTER TABLE query_results
+                    ADD COLUMN encoding TEXT NOT NULL DEFAULT 'json'
+                """)
+            
+            # Databases created before count-only results require data. SQLite
+            # can't drop a NOT NULL constraint in place, so the table is
+            # rebuilt, and the script below recreates its indexes. dbt's
+            # views over query_results live in the same database; with the
+            # legacy rename they are left alone and resolve to the new table,
+            # instead of failing the rename while query_results is missing.
+            if columns.get("data"):
+                names = "id, logical_name, query_id, data, timestamp, row_count, created_at, encoding"
+                conn.execute("PRAGMA legacy_alter_table=ON")
+                try:
+                    conn.executescript(f"""
+                        BEGIN;
+                        CREATE TABLE query_results_new ({QUERY_RESULTS_COLUMNS});
+                        INSERT INTO query_results_new ({names})
+                        SELECT {names} FROM query_results;
+                        DROP TABLE query_results;
+                        ALTER TABLE query_results_new RENAME TO query_results;
+                        COMMIT;
+                    """)
+                finally:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    conn.execute("PRAGMA legacy_alter_table=OFF")
+            
+            # All tables and indexes are created by one script
+            conn.executescript(f"""
+                -- Query results
+                CREATE TABLE IF NOT EXISTS query_results ({QUERY_RESULTS_COLUMNS});
+                
+                -- Indexes for faster queries. The latest result of a query
+                -- is the first entry for its name in idx_name_ts, which also
+                -- serves lookups by name alone.
+                DROP INDEX IF EXISTS idx_logical_name;
+                
+                CREATE INDEX IF NOT EXISTS idx_name_ts
+                ON query_results(logical_name, timestamp DESC, id DESC);
+                
+                CREATE INDEX IF NOT EXISTS idx_timestamp
+                ON query_results(timestamp DESC);
+                
+                CREATE INDEX IF NOT EXISTS idx_query_id
+                ON query_results(query_id);
+                
+                -- Individual result rows, filled when row_table is enabled
+                CREATE TABLE IF NOT EXISTS query_rows (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    result_id INTEGER NOT NULL REFERENCES query_results(id),
+                    query_id INTEGER NOT NULL,
+                    row_json TEXT NOT NULL
+                );
+                
+                CREATE INDEX IF NOT EXISTS idx_query_rows_result_id
+                ON query_rows(result_id);
+                
+                -- zstd dictionary per query for zstd+json results
+                CREATE TABLE IF NOT EXISTS zstd_dicts (
+                    dict_id INTEGER PRIMARY KEY,
+                    logical_name TEXT NOT NULL UNIQUE,
+                    dict_data BLOB NOT NULL
+                );
+            """)
+    
+    def _encode_rows(self, logical_name: str, rows: List[Dict[str, Any]]) -> Tuple[Union[str, bytes], str]:
+        """
+        Encode fetched rows for storage using the pipeline's storage encoding.
         
-        # Create indexes for faster queries
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_logical_name 
-            ON query_results(logical_name)
-        """)
+        Args:
+            logical_name: Logical name of the query the rows belong to
+            rows: Rows to encode
+            
+        Returns:
+            Tuple of (encoded data, encoding name)
+        """
+        if self.storage_encoding == "msgpack":
+            try:
+                return msgpack.packb(rows, use_bin_type=True), "msgpack"
+            except (OverflowError, TypeError):
+                # Integers wider than 64 bits don't fit MessagePack
+                pass
+        if self.storage_encoding == "zstd+json":
+            # One line per row, so the rows double as training samples and the
+            # export can hand the decompressed data straight to pyarrow
+            lines = [_json_dumps(row).encode() for row in rows]
+            compressor = zstandard.ZstdCompressor(
+                level=ZSTD_LEVEL,
+                dict_data=self._zstd_dict_for(logical_name, lines)
+            )
+            return compressor.compress(b"\n".join(lines)), "zstd+json"
+        return _json_dumps(rows) if rows else "[]", "json"
+    
+    def _zstd_dict_for(self, logical_name: str, samples: List[bytes]) -> Optional["zstandard.ZstdCompressionDict"]:
+        """
+        Get the zstd dictionary of a query, training it on samples if the
+        query has none yet.
         
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_timestamp 
-            ON query_results(timestamp DESC)
-        """)
+        Returns:
+            The dictionary, or None if the samples are too few to train one
+        """
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT dict_id, dict_data FROM zstd_dicts WHERE logical_name = ?",
+                (logical_name,)
+            ).fetchone()
+            if row:
+                dict_id, dict_data = row
+                if dict_id not in self._zstd_dicts:
+                    self._zstd_dicts[dict_id] = zstandard.ZstdCompressionDict(dict_data)
+                return self._zstd_dicts[dict_id]
+            
+            try:
+                dictionary = zstandard.train_dictionary(ZSTD_DICT_SIZE, samples)
+            except zstandard.ZstdError:
+                return None
+            
+            # Stored in the caller's transaction, alongside the first result
+            # compressed with it
+            conn.execute(
+                "INSERT INTO zstd_dicts (dict_id, logical_name, dict_data) VALUES (?, ?, ?)",
+                (dictionary.dict_id(), logical_name, dictionary.as_bytes())
+            )
+            self._zstd_dicts[dictionary.dict_id()] = dictionary
+            return dictionary
+    
+    def _decode_rows(self, data: Union[str, bytes], encoding: str) -> List[Dict[str, Any]]:
+        """
+        Decode stored rows.
         
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_query_id 
-            ON query_results(query_id)
-        """)
+        Raises:
+            ValueError: If the data can't be decoded
+        """
+        if encoding == "msgpack":
+            if not HAS_MSGPACK:
+                raise ValueError("msgpack is required to read this result")
+            return msgpack.unpackb(data, raw=False)
+        if encoding == "zstd+json":
+            lines = self._decompress(data).decode()
+            return _json_loads("[" + lines.replace("\n", ",") + "]")
+        return _json_loads(data)
+    
+    def _decompress(self, data: bytes) -> bytes:
+        """
+        Decompress a zstd+json result, loading its dictionary if needed.
         
-        conn.commit()
-        conn.close()
+        Raises:
+            ValueError: If the data can't be decompressed
+        """
+        if not HAS_ZSTD:
+            raise ValueError("zstandard is required to read this result")
+        try:
+            dict_id = zstandard.get_frame_parameters(data).dict_id
+            if dict_id and dict_id not in self._zstd_dicts:
+                with self._db() as conn:
+                    row = conn.execute(
+                        "SELECT dict_data FROM zstd_dicts WHERE dict_id = ?", (dict_id,)
+                    ).fetchone()
+                if not row:
+                    raise ValueError(f"zstd dictionary {dict_id} not found")
+                self._zstd_dicts[dict_id] = zstandard.ZstdCompressionDict(row[0])
+            decompressor = zstandard.ZstdDecompressor(dict_data=self._zstd_dicts.get(dict_id))
+            return decompressor.decompress(data)
+        except zstandard.ZstdError as e:
+            raise ValueError("Invalid zstd data") from e
     
     def _retry_with_backoff(self, func, max_retries: int = 3, base_delay: float = 1.0):
         """
@@ -150,30 +645,72 @@ class DuneDataPipeline:
         
         raise Exception("Max retries exceeded")
     
-    def fetch_query(self, logical_name: str, wait_for_completion: bool = True) -> Optional[QueryResult]:
+    async def _aretry_with_backoff(self, coro_func, max_retries: int = 3, base_delay: float = 1.0):
         """
-        Fetch the latest result for a query by logical name.
+        Retry a coroutine function with exponential backoff.
+        
+        Like _retry_with_backoff, but waits with asyncio.sleep so other
+        fetches on the event loop keep running during the backoff.
         
         Args:
-            logical_name: Logical name of the query
-            wait_for_completion: Whether to wait for query execution to complete
+            coro_func: Function returning a new coroutine to await per attempt
+            max_retries: Maximum number of retries
+            base_delay: Base delay in seconds for exponential backoff
             
         Returns:
-            QueryResult object or None if query not found
+            Result of the awaited coroutine
         """
-        if logical_name not in QUERY_IDS:
+        for attempt in range(max_retries):
+            try:
+                return await coro_func()
+            except Exception as e:
+                if attempt == max_retries - 1:
+                    raise
+                
+                delay = base_delay * (2 ** attempt)
+                print(f"  Attempt {attempt + 1} failed: {e}")
+                print(f"  Retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+        
+        raise Exception("Max retries exceeded")
+    
+    def _query_for(self, logical_name: str) -> Optional[QueryBase]:
+        """Get the Dune query for a logical name, or None if it is unknown"""
+        query = self._queries.get(logical_name)
+        if query is None:
             print(f"Error: Unknown query name '{logical_name}'")
-            print(f"Available queries: {', '.join(QUERY_IDS.keys())}")
+            print(f"Available queries: {_QUERY_NAMES_STR}")
             return None
         
-        query_id = QUERY_IDS[logical_name]
+        print(f"Fetching query: {logical_name} (ID: {query.query_id})...")
+        
+        return query
+    
+    @staticmethod
+    def _result_rows(results, query: QueryBase) -> Optional[List[Dict[str, Any]]]:
+        """Extract the rows from a Dune ResultsResponse"""
+        if not results or not hasattr(results, 'result') or not results.result:
+            print(f"  No results found for query {query.query_id}")
+            return None
         
-        print(f"Fetching query: {logical_name} (ID: {query_id})...")
+        return results.result.rows or []
+    
+    def fetch_rows(self, logical_name: str, wait_for_completion: bool = True) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the latest result rows for a query from Dune without storing them.
         
-        try:
-            # Create QueryBase object
-            query = QueryBase(query_id=query_id, name=logical_name)
+        Args:
+            logical_name: Logical name of the query
+            wait_for_completion: Whether to wait for query execution to complete
             
+        Returns:
+            List of result rows, or None if the query is unknown or the fetch failed
+        """
+        query = self._query_for(logical_name)
+        if query is None:
+            return None
+        
+        try:
             if wait_for_completion:
                 # Execute query and wait for completion (uses execution credits)
                 def execute_query():
@@ -187,64 +724,456 @@ class DuneDataPipeline:
                 
                 results = self._retry_with_backoff(get_latest)
             
-            # Extract data from ResultsResponse
-            if not results or not hasattr(results, 'result') or not results.result:
-                print(f"  No results found for query {query_id}")
-                return None
+            return self._result_rows(results, query)
             
-            rows = results.result.rows
-            row_count = len(rows) if rows else 0
+        except Exception as e:
+            print(f"  [ERROR] Error fetching query: {e}")
+            return None
+    
+    async def afetch_rows(
+        self,
+        client: AsyncDuneClient,
+        logical_name: str,
+        wait_for_completion: bool = True
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Async version of fetch_rows using an open AsyncDuneClient.
+        
+        Args:
+            client: Connected AsyncDuneClient (see afetch_all)
+            logical_name: Logical name of the query
+            wait_for_completion: Whether to wait for query execution to complete
+            
+        Returns:
+            List of result rows, or None if the query is unknown or the fetch failed
+        """
+        query = self._query_for(logical_name)
+        if query is None:
+            return None
+        
+        try:
+            if wait_for_completion:
+                # Execute query and wait for completion (uses execution credits)
+                results = await self._aretry_with_backoff(lambda: client.run_query(query))
+            else:
+                # Get latest results without executing (doesn't use execution credits)
+                results = await self._aretry_with_backoff(lambda: client.get_latest_result(query))
+            
+            return self._result_rows(results, query)
+            
+        except Exception as e:
+            print(f"  [ERROR] Error fetching query: {e}")
+            return None
+    
+    async def afetch_all(
+        self,
+        force: bool = False,
+        max_concurrency: int = MAX_CONCURRENT_FETCHES
+    ) -> Dict[str, Optional[QueryResult]]:
+        """
+        Fetch all queries concurrently on the running event loop.
+        
+        All fetches share one aiohttp session, and retry backoff and status
+        polling yield to the other fetches instead of blocking a thread.
+        Results are written to SQLite in a single transaction once every
+        query has been fetched. Queries whose stored result is still within
+        its TTL are not fetched again.
+        
+        Args:
+            force: Fetch every query even if its stored result is still fresh
+            max_concurrency: Maximum number of queries fetched at once
+            
+        Returns:
+            Dictionary mapping logical names to QueryResult objects
+        """
+        fresh = {}
+        if not force:
+            for logical_name in QUERY_IDS:
+                cached = self.get_fresh_result(logical_name)
+                if cached:
+                    fresh[logical_name] = cached
+        pending = [logical_name for logical_name in QUERY_IDS if logical_name not in fresh]
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        client_class = _OrjsonAsyncDuneClient if HAS_ORJSON else AsyncDuneClient
+        async with client_class(self.api_key, connection_limit=max_concurrency) as client:
+            async def fetch_one(logical_name):
+                async with semaphore:
+                    return await self.afetch_rows(client, logical_name)
+            
+            fetched = await asyncio.gather(*[fetch_one(logical_name) for logical_name in pending])
+        
+        stored = self.store_results(dict(zip(pending, fetched))) if pending else {}
+        return {
+            logical_name: fresh.get(logical_name) or stored.get(logical_name)
+            for logical_name in QUERY_IDS
+        }
+    
+    def store_results(self, fetched: Dict[str, Optional[List[Dict[str, Any]]]]) -> Dict[str, Optional[QueryResult]]:
+        """
+        Store fetched rows for one or more queries in a single transaction.
+        
+        Args:
+            fetched: Dictionary mapping logical names to rows from fetch_rows
+                (None entries are passed through as failed fetches)
             
-            # Store in database
-            timestamp = datetime.now().isoformat()
-            data_json = json.dumps(rows) if rows else "[]"
+        Returns:
+            Dictionary mapping logical names to stored QueryResult objects
+        """
+        results = {}
+        
+        with self._db() as conn:
+            # One commit (and sync) for the whole batch
+            with conn:
+                cursor = conn.cursor()
+                for logical_name, rows in fetched.items():
+                    if rows is None:
+                        results[logical_name] = None
+                        continue
+                    
+                    query_id = QUERY_IDS[logical_name]
+                    row_count = len(rows)
+                    timestamp = datetime.now().isoformat()
+                    data, encoding = self._encode_rows(logical_name, rows)
+                    
+                    cursor.execute("""
+                        INSERT INTO query_results 
+                        (logical_name, query_id, data, timestamp, row_count, encoding)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (logical_name, query_id, data, timestamp, row_count, encoding))
+                    result_id = cursor.lastrowid
+                    
+                    if self.row_table:
+                        # One prepared statement for every row, in the same
+                        # transaction as the result itself
+                        cursor.executemany("""
+                            INSERT INTO query_rows (result_id, query_id, row_json)
+                            VALUES (?, ?, ?)
+                        """, ((result_id, query_id, _json_dumps(row)) for row in rows))
+                    
+                    results[logical_name] = QueryResult(
+                        id=result_id,
+                        logical_name=logical_name,
+                        query_id=query_id,
+                        data=data,
+                        timestamp=timestamp,
+                        row_count=row_count,
+                        encoding=encoding
+                    )
+        
+        # Only cache once the results are committed
+        for logical_name, rows in fetched.items():
+            if results[logical_name] is not None:
+                self._cache_rows(logical_name, results[logical_name].id, rows)
+        
+        return results
+    
+    def get_fresh_result(self, logical_name: str, with_rows: bool = True) -> Optional[QueryResult]:
+        """
+        Get the stored result for a query if it is still within its fetch TTL.
+        
+        Only the result's metadata is read; its data is left in the database
+        (data is None on the returned QueryResult).
+        
+        Args:
+            logical_name: Logical name of the query
+            with_rows: Only consider results whose rows were stored, rather
+                than also count-only results
             
-            conn = sqlite3.connect(self.db_path)
+        Returns:
+            The latest stored QueryResult, or None if it is missing or stale
+        """
+        with self._db() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO query_results 
-                (logical_name, query_id, data, timestamp, row_count)
-                VALUES (?, ?, ?, ?, ?)
-            """, (logical_name, query_id, data_json, timestamp, row_count))
-            conn.commit()
-            conn.close()
             
-            print(f"  [OK] Fetched {row_count} rows and stored in database")
+            cursor.execute("""
+                SELECT id, query_id, timestamp, row_count, encoding
+                FROM query_results
+                WHERE logical_name = ? AND (data IS NOT NULL OR NOT ?)
+                ORDER BY timestamp DESC
+                LIMIT 1
+            """, (logical_name, with_rows))
             
-            return QueryResult(
-                id=cursor.lastrowid,
-                logical_name=logical_name,
-                query_id=query_id,
-                data=data_json,
-                timestamp=timestamp,
-                row_count=row_count
-            )
+            row = cursor.fetchone()
+        
+        if not row:
+            return None
+        
+        result_id, query_id, timestamp, row_count, encoding = row
+        if datetime.now() - datetime.fromisoformat(timestamp) >= timedelta(seconds=self.fetch_ttl_seconds):
+            return None
+        
+        print(f"  [SKIP] '{logical_name}' was fetched at {timestamp[:19]} and is still fresh")
+        return QueryResult(
+            id=result_id,
+            logical_name=logical_name,
+            query_id=query_id,
+            data=None,
+            timestamp=timestamp,
+            row_count=row_count,
+            encoding=encoding
+        )
+    
+    def fetch_row_count(self, logical_name: str, wait_for_completion: bool = True) -> Optional[int]:
+        """
+        Fetch the number of rows in the latest result of a query.
+        
+        When executing the query, the count is read from the execution status
+        once it completes, so the rows are never downloaded. dune-client only
+        returns the latest result without executing as a whole, so in that
+        case the rows are fetched and counted.
+        
+        Args:
+            logical_name: Logical name of the query
+            wait_for_completion: Whether to wait for query execution to complete
             
+        Returns:
+            Row count, or None if the query is unknown or the fetch failed
+        """
+        if not wait_for_completion:
+            rows = self.fetch_rows(logical_name, wait_for_completion)
+            return None if rows is None else len(rows)
+        
+        query = self._query_for(logical_name)
+        if query is None:
+            return None
+        
+        # Execute query and wait for completion (uses execution credits)
+        def execute_query():
+            job_id = self.client.execute_query(query).execution_id
+            status = self.client.get_execution_status(job_id)
+            while status.state not in ExecutionState.terminal_states():
+                time.sleep(STATUS_POLL_SECONDS)
+                status = self.client.get_execution_status(job_id)
+            if not status.result_metadata:
+                raise Exception(f"Query execution ended as {status.state}")
+            return status.result_metadata.total_row_count
+        
+        try:
+            return self._retry_with_backoff(execute_query)
         except Exception as e:
             print(f"  [ERROR] Error fetching query: {e}")
             return None
     
-    def fetch_all(self) -> Dict[str, Optional[QueryResult]]:
+    def store_row_count(self, logical_name: str, row_count: int) -> QueryResult:
         """
-        Fetch all queries defined in QUERY_IDS.
+        Store a count-only result for a query, with NULL data.
         
+        Args:
+            logical_name: Logical name of the query
+            row_count: Number of rows in the fetched result
+            
         Returns:
-            Dictionary mapping logical names to QueryResult objects
+            Stored QueryResult, with data set to None
+        """
+        query_id = QUERY_IDS[logical_name]
+        timestamp = datetime.now().isoformat()
+        
+        with self._db() as conn:
+            with conn:
+                cursor = conn.execute("""
+                    INSERT INTO query_results
+                    (logical_name, query_id, data, timestamp, row_count)
+                    VALUES (?, ?, NULL, ?, ?)
+                """, (logical_name, query_id, timestamp, row_count))
+                result_id = cursor.lastrowid
+        
+        return QueryResult(
+            id=result_id,
+            logical_name=logical_name,
+            query_id=query_id,
+            data=None,
+            timestamp=timestamp,
+            row_count=row_count
+        )
+    
+    def fetch_query(
+        self,
+        logical_name: str,
+        wait_for_completion: bool = True,
+        force: bool = False,
+        store_rows: bool = True
+    ) -> Optional[QueryResult]:
+        """
+        Fetch the latest result for a query by logical name.
+        
+        Args:
+            logical_name: Logical name of the query
+            wait_for_completion: Whether to wait for query execution to complete
+            force: Fetch even if the stored result is still within its TTL
+            store_rows: Store the result's rows. If False, only the row count
+                is fetched and stored, with NULL data; such results are
+                skipped by get, tail, list, the export and dbt.
+            
+        Returns:
+            QueryResult object or None if query not found
+        """
+        if not force and logical_name in _QUERY_NAMES:
+            cached = self.get_fresh_result(logical_name, with_rows=store_rows)
+            if cached:
+                return cached
+        
+        if store_rows:
+            rows = self.fetch_rows(logical_name, wait_for_completion)
+            if rows is None:
+                return None
+            store = lambda: self.store_results({logical_name: rows})[logical_name]
+        else:
+            row_count = self.fetch_row_count(logical_name, wait_for_completion)
+            if row_count is None:
+                return None
+            store = lambda: self.store_row_count(logical_name, row_count)
+        
+        try:
+            result = store()
+        except sqlite3.Error as e:
+            print(f"  [ERROR] Error storing query: {e}")
+            return None
+        
+        if store_rows:
+            print(f"  [OK] Fetched {result.row_count} rows and stored in database")
+        else:
+            print(f"  [OK] Counted {result.row_count} rows and stored the count in database")
+        return result
+    
+    def fetch_all(
+        self,
+        batch_commit: bool = False,
+        force: bool = False,
+        max_workers: int = MAX_CONCURRENT_FETCHES
+    ) -> Iterator[Tuple[str, Optional[QueryResult]]]:
+        """
+        Fetch all queries defined in QUERY_IDS, yielding each result once stored.
+        
+        Queries are fetched concurrently on a small thread pool, since each
+        one mostly waits on Dune. Results are streamed in completion order
+        rather than collected, so callers that only need counts never hold
+        every query's data at once. Queries whose stored result is still
+        within its TTL are skipped and their stored result is yielded instead.
+        
+        Args:
+            batch_commit: Store all results in one transaction once every
+                query has been fetched, instead of committing per query
+            force: Fetch every query even if its stored result is still fresh
+            max_workers: Maximum number of queries fetched at once
+        
+        Yields:
+            (logical name, QueryResult or None on failure) for each query
         """
         print("Fetching all queries...")
         print(f"Total queries: {len(QUERY_IDS)}")
         print()
         
-        results = {}
+        successful = 0
+        pending = []
         for logical_name in QUERY_IDS.keys():
-            results[logical_name] = self.fetch_query(logical_name)
-            time.sleep(1)  # Rate limiting
+            cached = None if force else self.get_fresh_result(logical_name)
+            if cached:
+                successful += 1
+                yield logical_name, cached
+            else:
+                pending.append(logical_name)
+        
+        # Workers only wait on Dune concurrently; their stores take turns on
+        # the pipeline's database connection
+        fetch = self.fetch_rows if batch_commit else functools.partial(self.fetch_query, force=True)
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch, logical_name): logical_name for logical_name in pending}
+            for future in as_completed(futures):
+                logical_name = futures[future]
+                if batch_commit:
+                    fetched[logical_name] = future.result()
+                else:
+                    result = future.result()
+                    successful += result is not None
+                    yield logical_name, result
+        
+        if fetched:
+            try:
+                stored = self.store_results(fetched)
+            except sqlite3.Error as e:
+                print(f"[ERROR] Error storing query results: {e}")
+                stored = {}
+            for logical_name in fetched:
+                result = stored.get(logical_name)
+                successful += result is not None
+                yield logical_name, result
         
-        successful = sum(1 for r in results.values() if r is not None)
         print()
         print(f"Completed: {successful}/{len(QUERY_IDS)} queries fetched successfully")
+    
+    def _cache_rows(self, logical_name: str, result_id: int, rows: List[Dict[str, Any]]):
+        """Remember the decoded rows of a query's latest result"""
+        self._result_cache[logical_name] = (result_id, rows)
+        self._result_cache.move_to_end(logical_name)
+        while len(self._result_cache) > RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+    
+    def _latest_rows(
+        self,
+        logical_name: str,
+        start: int = 0,
+        stop: Optional[int] = None
+    ) -> Optional[Tuple[List[Dict[str, Any]], str, int]]:
+        """
+        Get a slice of the decoded rows of a query's most recent result.
         
-        return results
+        Cached results are sliced directly. Otherwise JSON results are sliced
+        by SQLite's json_each, so only the requested rows are decoded in
+        Python; other encodings are decoded whole and cached.
+        
+        Args:
+            logical_name: Logical name of the query
+            start: Index of the first row, as in rows[start:stop]
+            stop: Index after the last row (None for the end)
+        
+        Returns:
+            Tuple of (rows, timestamp, total row count), or None if nothing
+            is stored
+            
+        Raises:
+            ValueError: If the stored data can't be decoded
+        """
+        with self._db() as conn:
+            row = conn.execute("""
+                SELECT id, timestamp, row_count, encoding
+                FROM query_results
+                WHERE logical_name = ? AND data IS NOT NULL
+                ORDER BY timestamp DESC
+                LIMIT 1
+            """, (logical_name,)).fetchone()
+            
+            if not row:
+                return None
+            
+            result_id, timestamp, row_count, encoding = row
+            cached = self._result_cache.get(logical_name)
+            if cached and cached[0] == result_id:
+                self._result_cache.move_to_end(logical_name)
+                return cached[1][start:stop], timestamp, row_count
+            
+            if encoding == "json":
+                first, end, _ = slice(start, stop).indices(row_count)
+                try:
+                    cursor = conn.execute("""
+                        SELECT j.value
+                        FROM query_results r, json_each(r.data) j
+                        WHERE r.id = ?
+                        ORDER BY j.key
+                        LIMIT ? OFFSET ?
+                    """, (result_id, max(end - first, 0), first))
+                    return [_json_loads(value) for (value,) in cursor], timestamp, row_count
+                except sqlite3.OperationalError as e:
+                    raise ValueError(f"Invalid JSON in result {result_id}") from e
+            
+            (data,) = conn.execute(
+                "SELECT data FROM query_results WHERE id = ?", (result_id,)
+            ).fetchone()
+        
+        rows = self._decode_rows(data, encoding)
+        self._cache_rows(logical_name, result_id, rows)
+        return rows[start:stop], timestamp, row_count
     
     def get_query(self, logical_name: str, limit: int = 100, offset: int = 0) -> Optional[List[Dict[str, Any]]]:
         """
@@ -258,41 +1187,23 @@ class DuneDataPipeline:
         Returns:
             List of result dictionaries, or None if query not found
         """
-        if logical_name not in QUERY_IDS:
+        if logical_name not in _QUERY_NAMES:
             print(f"Error: Unknown query name '{logical_name}'")
             return None
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get most recent result for this query
-        cursor.execute("""
-            SELECT data, timestamp, row_count
-            FROM query_results
-            WHERE logical_name = ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """, (logical_name,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        try:
+            latest = self._latest_rows(logical_name, offset, offset + limit)
+        except ValueError:
+            print(f"Error parsing data for query '{logical_name}'")
+            return None
         
-        if not row:
+        if not latest:
             print(f"No data found for query '{logical_name}'")
             print("Run 'fetch' or 'fetch-all' first to populate data")
             return None
         
-        data_json, timestamp, total_rows = row
-        
-        # Parse JSON data
-        try:
-            all_data = json.loads(data_json)
-        except json.JSONDecodeError:
-            print(f"Error parsing data for query '{logical_name}'")
-            return None
-        
-        # Apply pagination
-        paginated_data = all_data[offset:offset + limit]
+        # Only the requested page is decoded
+        paginated_data, timestamp, total_rows = latest
         
         print(f"Query: {logical_name}")
         print(f"Total rows: {total_rows}")
@@ -312,46 +1223,109 @@ class DuneDataPipeline:
         Returns:
             List of result dictionaries, or None if query not found
         """
-        if logical_name not in QUERY_IDS:
+        if logical_name not in _QUERY_NAMES:
             print(f"Error: Unknown query name '{logical_name}'")
             return None
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get most recent result
-        cursor.execute("""
-            SELECT data, timestamp
-            FROM query_results
-            WHERE logical_name = ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """, (logical_name,))
-        
-        row = cursor.fetchone()
-        conn.close()
-        
-        if not row:
-            print(f"No data found for query '{logical_name}'")
-            return None
-        
-        data_json, timestamp = row
-        
         try:
-            all_data = json.loads(data_json)
-        except json.JSONDecodeError:
+            latest = self._latest_rows(logical_name, -n)
+        except ValueError:
             print(f"Error parsing data")
             return None
         
-        # Get last N rows
-        tail_data = all_data[-n:] if len(all_data) > n else all_data
+        if not latest:
+            print(f"No data found for query '{logical_name}'")
+            return None
+        
+        # Last N rows
+        tail_data, timestamp, total_rows = latest
         
         print(f"Query: {logical_name}")
-        print(f"Last {len(tail_data)} rows (out of {len(all_data)} total)")
+        print(f"Last {len(tail_data)} rows (out of {total_rows} total)")
         print(f"Last updated: {timestamp}")
         
         return tail_data
     
+    def _latest_results(self, columns: str) -> Dict[str, tuple]:
+        """
+        Get the most recent stored result of every query in one statement.
+        
+        Args:
+            columns: Columns of query_results (aliased r) to select
+            
+        Returns:
+            Dictionary mapping logical names to tuples of the selected columns
+        """
+        with self._db() as conn:
+            cursor = conn.execute(LATEST_RESULTS_SQL.format(columns=columns))
+            return {row[0]: row[1:] for row in cursor}
+    
+    def _result_tables(self, results: Dict[int, str]) -> Dict[int, "pa.Table"]:
+        """
+        Load stored results as Arrow tables, reading all of them at once.
+        
+        JSON results are split into rows by a single json_each scan and
+        parsed by pyarrow's JSON reader, so no Python objects are built per
+        row. A malformed result fails the whole scan, in which case the
+        results are scanned one by one so only that result is dropped.
+        
+        Args:
+            results: Dictionary mapping result ids to their storage encodings
+            
+        Returns:
+            Dictionary mapping result ids to tables. Results whose data can't
+            be decoded are left out.
+        """
+        json_ids = [result_id for result_id, encoding in results.items() if encoding == "json"]
+        other_ids = [result_id for result_id, encoding in results.items() if encoding != "json"]
+        
+        with self._db() as conn:
+            def scan(ids: List[int]) -> Dict[int, List[str]]:
+                values = {result_id: [] for result_id in ids}
+                cursor = conn.execute(f"""
+                    SELECT r.id, j.value
+                    FROM query_results r, json_each(r.data) j
+                    WHERE r.id IN ({", ".join("?" * len(ids))})
+                    ORDER BY r.id, j.key
+                """, ids)
+                for result_id, value in cursor:
+                    values[result_id].append(value)
+                return values
+            
+            values = {}
+            if json_ids:
+                try:
+                    values = scan(json_ids)
+                except sqlite3.OperationalError:
+                    for result_id in json_ids:
+                        try:
+                            values.update(scan([result_id]))
+                        except sqlite3.OperationalError:
+                            pass
+            
+            data = {}
+            if other_ids:
+                data = dict(conn.execute(
+                    f"SELECT id, data FROM query_results WHERE id IN ({', '.join('?' * len(other_ids))})",
+                    other_ids
+                ))
+        
+        tables = {}
+        for result_id, rows in values.items():
+            try:
+                tables[result_id] = _read_ndjson("\n".join(rows).encode())
+            except (ValueError, pa.ArrowException):
+                pass
+        for result_id, blob in data.items():
+            try:
+                if results[result_id] == "zstd+json":
+                    tables[result_id] = _read_ndjson(self._decompress(blob))
+                else:
+                    tables[result_id] = pa.Table.from_pylist(self._decode_rows(blob, results[result_id]))
+            except (ValueError, pa.ArrowException):
+                pass
+        return tables
+    
     def list_queries(self) -> List[Dict[str, Any]]:
         """
         List all available queries with their latest fetch info.
@@ -359,20 +1333,11 @@ class DuneDataPipeline:
         Returns:
             List of query information dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        latest = self._latest_results("r.timestamp, r.row_count")
         
         query_info = []
         for logical_name, query_id in QUERY_IDS.items():
-            cursor.execute("""
-                SELECT timestamp, row_count
-                FROM query_results
-                WHERE logical_name = ?
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """, (logical_name,))
-            
-            row = cursor.fetchone()
+            row = latest.get(logical_name)
             last_fetch = row[0] if row else None
             row_count = row[1] if row else 0
             
@@ -383,7 +1348,6 @@ class DuneDataPipeline:
                 "row_count": row_count
             })
         
-        conn.close()
         return query_info
     
     def export_for_artemis(
@@ -401,17 +1365,22 @@ class DuneDataPipeline:
         Returns:
             Dictionary with export summary
         """
-        if not HAS_PANDAS:
+        if not HAS_PYARROW:
             raise ImportError(
-                "pandas and pyarrow are required for Artemis export. "
-                "Install with: pip install pandas pyarrow"
+                "pyarrow is required for Artemis export. "
+                "Install with: pip install pyarrow"
             )
         
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
+        # One clock reading for the whole export: the summary, every row's
+        # _exported_at and the file names all carry the same time
+        export_time = datetime.now()
+        exported_at = export_time.isoformat()
+        
         export_summary = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": exported_at,
             "queries_exported": [],
             "total_rows": 0,
             "files_created": []
@@ -420,51 +1389,42 @@ class DuneDataPipeline:
         print(f"Exporting data for Artemis Analytics to {output_dir}/...")
         print()
         
-        # Collect all query data
-        all_data = []
+        # Each query's result is read straight into an Arrow table, without
+        # building a Python dict per row
+        tables = []
+        
+        # Most recent result of every query, with all of their data read in
+        # one pass rather than a statement per query
+        latest = self._latest_results("r.id, r.timestamp, r.row_count, r.encoding")
+        result_tables = self._result_tables({row[0]: row[3] for row in latest.values()})
         
         for logical_name, query_id in QUERY_IDS.items():
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get most recent result
-            cursor.execute("""
-                SELECT data, timestamp, row_count
-                FROM query_results
-                WHERE logical_name = ?
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """, (logical_name,))
-            
-            row = cursor.fetchone()
-            conn.close()
-            
+            row = latest.get(logical_name)
             if not row:
                 print(f"  [WARN] Skipping '{logical_name}' - no data found")
                 continue
             
-            data_json, timestamp, row_count = row
+            result_id, timestamp, row_count, encoding = row
             
-            try:
-                rows = json.loads(data_json)
-            except json.JSONDecodeError:
-                print(f"  [WARN] Skipping '{logical_name}' - invalid JSON")
+            table = result_tables.pop(result_id, None)
+            if table is None:
+                print(f"  [WARN] Skipping '{logical_name}' - invalid data")
                 continue
             
-            if not rows:
+            if table.num_rows == 0:
                 print(f"  [WARN] Skipping '{logical_name}' - empty result")
                 continue
             
-            # Add metadata to each row
-            for row_data in rows:
-                enriched_row = {
-                    **row_data,
-                    "_query_name": logical_name,
-                    "_query_id": query_id,
-                    "_fetched_at": timestamp,
-                    "_exported_at": datetime.now().isoformat()
-                }
-                all_data.append(enriched_row)
+            # Add metadata columns, one constant column per field
+            metadata = {
+                "_query_name": logical_name,
+                "_query_id": query_id,
+                "_fetched_at": timestamp,
+                "_exported_at": exported_at
+            }
+            for name, value in metadata.items():
+                table = table.append_column(name, _constant_column(value, table.num_rows))
+            tables.append(table)
             
             export_summary["queries_exported"].append({
                 "logical_name": logical_name,
@@ -476,29 +1436,80 @@ class DuneDataPipeline:
             
             print(f"  [OK] '{logical_name}': {row_count} rows")
         
-        if not all_data:
+        if not tables:
             print("\n[WARN] No data to export. Run 'fetch-all' first to populate data.")
             return export_summary
         
-        # Create DataFrame
-        df = pd.DataFrame(all_data)
+        # Queries return different columns, so the files use one schema
+        # covering all of them
+        schema = _unify_schemas([table.schema for table in tables])
         
         # Export based on format
-        timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp_str = export_time.strftime("%Y%m%d_%H%M%S")
+        parquet_path = output_path / f"artemis_x402_dune_data_{timestamp_str}.parquet"
+        csv_path = output_path / f"artemis_x402_dune_data_{timestamp_str}.csv"
+        
+        # CSV has no list or struct types, so such columns (e.g. Dune array
+        # columns) are written to it as JSON text
+        csv_schema = schema
+        if any(pa.types.is_nested(field.type) for field in schema):
+            csv_schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_nested(field.type) else field
+                for field in schema
+            ])
+        
+        # Stream each query into the files as its own row group. Both formats
+        # are written at once; pyarrow's encoders release the GIL, so Parquet
+        # encoding overlaps with CSV formatting.
+        total_rows = 0
+        null_counts = dict.fromkeys(schema.names, 0)
+        writers = []
+        written = False
+        try:
+            if format in ["parquet", "both"]:
+                # Without the stored Arrow schema, readers see the dictionary-encoded
+                # metadata columns as plain strings
+                writers.append((
+                    pq.ParquetWriter(parquet_path, schema, compression="zstd", store_schema=False),
+                    schema
+                ))
+            if format in ["csv", "both"]:
+                writers.append((pacsv.CSVWriter(csv_path, csv_schema), csv_schema))
+            
+            with ThreadPoolExecutor(max_workers=max(len(writers), 1)) as executor:
+                while tables:
+                    table = _conform_table(tables.pop(0), schema)
+                    futures = [
+                        executor.submit(
+                            writer.write_table,
+                            table if writer_schema is schema else _conform_table(table, writer_schema)
+                        )
+                        for writer, writer_schema in writers
+                    ]
+                    for future in futures:
+                        future.result()
+                    
+                    total_rows += table.num_rows
+                    for name, column in zip(schema.names, table.columns):
+                        null_counts[name] += column.null_count
+            written = True
+        finally:
+            for writer, _ in writers:
+                writer.close()
+            if not written:
+                # Don't leave truncated files behind
+                for path in (parquet_path, csv_path):
+                    path.unlink(missing_ok=True)
         
         if format in ["parquet", "both"]:
-            parquet_path = output_path / f"artemis_x402_dune_data_{timestamp_str}.parquet"
-            df.to_parquet(parquet_path, index=False, engine="pyarrow")
             export_summary["files_created"].append(str(parquet_path))
             print(f"\n[OK] Parquet file: {parquet_path}")
-            print(f"  Rows: {len(df)}, Columns: {len(df.columns)}")
+            print(f"  Rows: {total_rows}, Columns: {len(schema)}")
         
         if format in ["csv", "both"]:
-            csv_path = output_path / f"artemis_x402_dune_data_{timestamp_str}.csv"
-            df.to_csv(csv_path, index=False)
             export_summary["files_created"].append(str(csv_path))
             print(f"[OK] CSV file: {csv_path}")
-            print(f"  Rows: {len(df)}, Columns: {len(df.columns)}")
+            print(f"  Rows: {total_rows}, Columns: {len(schema)}")
         
         # Create schema metadata file
         schema_path = output_path / f"artemis_x402_dune_schema_{timestamp_str}.json"
@@ -506,14 +1517,14 @@ class DuneDataPipeline:
             "dataset_name": "x402_dune_analytics",
             "description": "X402 Dune Analytics query results exported for Artemis Analytics",
             "export_timestamp": export_summary["timestamp"],
-            "total_rows": int(len(df)),
+            "total_rows": total_rows,
             "columns": [
                 {
-                    "name": col,
-                    "type": str(df[col].dtype),
-                    "nullable": bool(df[col].isna().any())
+                    "name": field.name,
+                    "type": str(field.type.value_type if pa.types.is_dictionary(field.type) else field.type),
+                    "nullable": null_counts[field.name] > 0
                 }
-                for col in df.columns
+                for field in schema
             ],
             "queries": export_summary["queries_exported"],
             "artemis_integration": {
@@ -545,13 +1556,21 @@ class DuneDataPipeline:
         
         return export_summary
     
-    def run_dbt_transforms(self, dbt_project_dir: str = ".", profiles_dir: str = "dbt", project_file: str = "config/dbt_project.yml"):
+    def run_dbt_transforms(
+        self,
+        dbt_project_dir: str = ".",
+        profiles_dir: str = "dbt",
+        project_file: str = "config/dbt_project.yml",
+        runner: Optional[Any] = None
+    ):
         """
         Run dbt transformations on the exported data.
         
         Args:
             dbt_project_dir: Directory containing dbt_project.yml
             profiles_dir: Directory containing profiles.yml
+            runner: dbtRunner to reuse (see create_dbt_runner); a fresh one
+                is created if not given
             
         Returns:
             True if successful, False otherwise
@@ -567,12 +1586,9 @@ class DuneDataPipeline:
                 print("Running dbt transformations...")
             
             # Initialize dbt
-            dbt = dbtRunner()
+            dbt = runner or dbtRunner()
             
-            # Copy dbt_project.yml to root if needed
-            import shutil
-            if not Path("dbt_project.yml").exists() and Path(project_file).exists():
-                shutil.copy(project_file, "dbt_project.yml")
+            _ensure_dbt_project_file(project_file)
             
             # Run dbt models
             result = dbt.invoke(["run", "--project-dir", ".", "--profiles-dir", profiles_dir])
@@ -606,6 +1622,40 @@ class DuneDataPipeline:
             return False
 
 
+def _ensure_dbt_project_file(project_file: str = "config/dbt_project.yml"):
+    """Copy dbt_project.yml to the project root if needed"""
+    import shutil
+    if not Path("dbt_project.yml").exists() and Path(project_file).exists():
+        shutil.copy(project_file, "dbt_project.yml")
+
+
+def create_dbt_runner(profiles_dir: str = "dbt", project_file: str = "config/dbt_project.yml"):
+    """
+    Create a dbtRunner with the project manifest already parsed.
+    
+    Passing the returned runner to run_dbt_transforms on every run lets a
+    long-running process skip dbt's project parsing after the first time.
+    Model changes are picked up when the runner is recreated.
+    
+    Args:
+        profiles_dir: Directory containing profiles.yml
+        project_file: Path to the dbt_project.yml to use
+        
+    Returns:
+        dbtRunner instance, or None if dbt-core is not installed
+    """
+    try:
+        from dbt.cli.main import dbtRunner
+    except ImportError:
+        return None
+    
+    _ensure_dbt_project_file(project_file)
+    result = dbtRunner().invoke(["parse", "--project-dir", ".", "--profiles-dir", profiles_dir])
+    if result.success:
+        return dbtRunner(manifest=result.result)
+    return dbtRunner()
+
+
 def main():
     """Command line interface"""
     parser = argparse.ArgumentParser(
@@ -666,6 +1716,12 @@ Available commands:
         help="Dune API key (overrides DUNE_API_KEY env var)"
     )
     
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Fetch even if the stored result is still fresh (fetch, fetch-all)"
+    )
+    
     parser.add_argument(
         "--output-dir",
         default="data/exports",
@@ -679,12 +1735,30 @@ Available commands:
         help="Export format for export command (default: both)"
     )
     
+    parser.add_argument(
+        "--storage-encoding",
+        choices=STORAGE_ENCODINGS,
+        default="json",
+        help="How to store fetched rows; only json rows are read by dbt (default: json)"
+    )
+    
+    parser.add_argument(
+        "--row-table",
+        action="store_true",
+        help="Also store each fetched row in the query_rows table (fetch, fetch-all)"
+    )
+    
     args = parser.parse_args()
     
     # Initialize pipeline
     try:
-        pipeline = DuneDataPipeline(db_path=args.db, api_key=args.api_key)
-    except ValueError as e:
+        pipeline = DuneDataPipeline(
+            db_path=args.db,
+            api_key=args.api_key,
+            storage_encoding=args.storage_encoding,
+            row_table=args.row_table
+        )
+    except (ValueError, ImportError) as e:
         print(f"Error: {e}")
         sys.exit(1)
     
@@ -692,24 +1766,28 @@ Available commands:
     if args.command == "fetch":
         if not args.name:
             print("Error: Query name required for 'fetch' command")
-            print(f"Available queries: {', '.join(QUERY_IDS.keys())}")
+            print(f"Available queries: {_QUERY_NAMES_STR}")
             sys.exit(1)
         
-        result = pipeline.fetch_query(args.name)
+        result = pipeline.fetch_query(args.name, force=args.force)
         if result:
             print(f"\n[OK] Successfully fetched and stored query: {args.name}")
             print(f"  Rows: {result.row_count}")
             print(f"  Timestamp: {result.timestamp}")
     
     elif args.command == "fetch-all":
-        results = pipeline.fetch_all()
+        # Keep only row counts so fetched data isn't held for the summary
+        row_counts = {
+            name: result.row_count if result else None
+            for name, result in pipeline.fetch_all(force=args.force)
+        }
         print("\n" + "="*60)
         print("SUMMARY")
         print("="*60)
-        for name, result in results.items():
-            status = "[OK]" if result else "[ERROR]"
-            row_count = result.row_count if result else 0
-            print(f"{status} {name}: {row_count} rows")
+        for name in QUERY_IDS:
+            row_count = row_counts.get(name)
+            status = "[OK]" if row_count is not None else "[ERROR]"
+            print(f"{status} {name}: {row_count or 0} rows")
     
     elif args.command == "get":
         if not args.name: